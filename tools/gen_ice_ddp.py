@@ -24,6 +24,12 @@ import struct
 import sys
 import os
 
+# Precomputed package blob, regenerated with --rebuild (see regenerate_blob()).
+try:
+    from ice_pkg_blob import PACKAGE_BYTES
+except ImportError:
+    PACKAGE_BYTES = None
+
 # Constants from ice_ddp.h
 ICE_PKG_BUF_SIZE = 4096
 ICE_PKG_NAME_SIZE = 32
@@ -36,32 +42,55 @@ PKG_NAME = b"ICE OS Default Package"
 SEG_ID_METADATA = b"ICE Metadata"
 SEG_ID_ICE = b"ICE Configuration Data"
 
+# Padded/packed forms of the constants above, computed once at import time
+_SEG_ID_METADATA_PADDED = SEG_ID_METADATA[:ICE_PKG_NAME_SIZE].ljust(ICE_PKG_NAME_SIZE, b'\x00')
+_SEG_ID_ICE_PADDED = SEG_ID_ICE[:ICE_PKG_NAME_SIZE].ljust(ICE_PKG_NAME_SIZE, b'\x00')
+_PKG_NAME_32 = PKG_NAME[:ICE_PKG_NAME_SIZE].ljust(ICE_PKG_NAME_SIZE, b'\x00')
+_PKG_NAME_28 = PKG_NAME[:ICE_META_SECT_NAME_SIZE].ljust(ICE_META_SECT_NAME_SIZE, b'\x00')
+_VER_1_0_0_0 = bytes((1, 0, 0, 0))
+_VER_1_3_0_0 = bytes((1, 3, 0, 0))
+
+# Compiled struct formats, cached so repeated calls skip the format-string
+# lookup in the _struct module cache.
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_PKGVER = struct.Struct("BBBB")
+_BUFHDR = struct.Struct("<HH")
+_SECTENT = struct.Struct("<IHH")
+_SEGHDR = struct.Struct("<I4sI32s")
+# Package header: format_ver(4s) + seg_count(I) + seg_offset[2](II) = 16 bytes
+_PKG_HDR = struct.Struct("<4sIII")
+
+# Whole-segment formats: one pack per segment instead of header/body concats.
+# Metadata segment (84 bytes): generic hdr (I4sI32s) + pkg_ver(4s) + rsvd(I) + pkg_name(32s)
+_META_SEG = struct.Struct("<I4sI32s4sI32s")
+# ICE segment prefix (56 bytes): generic hdr + device_table_count + nvm table_count + buf_count
+_ICE_SEG_PREFIX = struct.Struct("<I4sI32sIII")
+
+# Populated head of the ice_buf: ice_buf_hdr(HH) + section_entry(IHH) +
+# ice_meta_sect ver(4s) + name(28s) + track_id(I) = 48 bytes.
+_ICE_BUF_STRUCT = struct.Struct("<HHIHH4s28sI")
+_ICE_BUF_PAD = bytes(ICE_PKG_BUF_SIZE - _ICE_BUF_STRUCT.size)
+
 
 def pack_pkg_ver(major, minor, update, draft):
     """Pack ice_pkg_ver: 4 bytes (major, minor, update, draft)."""
-    return struct.pack("BBBB", major, minor, update, draft)
+    return _PKGVER.pack(major, minor, update, draft)
 
 
 def pack_seg_hdr(seg_type, fmt_ver, seg_size, seg_id):
     """Pack ice_generic_seg_hdr: seg_type(le32) + seg_format_ver(4) + seg_size(le32) + seg_id(32)."""
-    seg_id_padded = seg_id[:ICE_PKG_NAME_SIZE].ljust(ICE_PKG_NAME_SIZE, b'\x00')
-    return struct.pack("<I", seg_type) + fmt_ver + struct.pack("<I", seg_size) + seg_id_padded
+    # Single pack: 32s zero-pads seg_id, so only over-long IDs need trimming
+    return _SEGHDR.pack(seg_type, fmt_ver, seg_size, seg_id[:ICE_PKG_NAME_SIZE])
 
 
 def build_metadata_segment():
     """Build ice_global_metadata_seg: hdr + pkg_ver(4) + rsvd(4) + pkg_name(32)."""
-    pkg_ver = pack_pkg_ver(1, 3, 0, 0)
-    fmt_ver = pack_pkg_ver(1, 3, 0, 0)
-    pkg_name = PKG_NAME[:ICE_PKG_NAME_SIZE].ljust(ICE_PKG_NAME_SIZE, b'\x00')
-    
-    # Body: pkg_ver(4) + rsvd(4) + pkg_name(32) = 40 bytes
-    body = pkg_ver + struct.pack("<I", 0) + pkg_name
-    
     # Header: seg_type(4) + seg_format_ver(4) + seg_size(4) + seg_id(32) = 44 bytes
-    seg_size = 44 + len(body)  # = 84 bytes
-    hdr = pack_seg_hdr(SEGMENT_TYPE_METADATA, fmt_ver, seg_size, SEG_ID_METADATA)
-    
-    return hdr + body
+    # Body: pkg_ver(4) + rsvd(4) + pkg_name(32) = 40 bytes
+    seg_size = _META_SEG.size  # = 84 bytes
+    return _META_SEG.pack(SEGMENT_TYPE_METADATA, _VER_1_3_0_0, seg_size,
+                          _SEG_ID_METADATA_PADDED, _VER_1_3_0_0, 0, _PKG_NAME_32)
 
 
 def build_ice_buf():
@@ -81,34 +110,23 @@ def build_ice_buf():
         name: "ICE OS Default Package" (28 bytes)
         track_id: 0  (4 bytes)
     """
-    buf = bytearray(ICE_PKG_BUF_SIZE)
-    
     # ice_buf_hdr
     section_count = 1
     # section_entry starts at offset 4 (after section_count + data_end)
     # Each section_entry is 8 bytes (type:4 + offset:2 + size:2)
     # Data starts after header: 4 + 8 * section_count = 12
     data_offset = 4 + 8 * section_count  # = 12
-    
+
     # ice_meta_sect: ver(4) + name(28) + track_id(4) = 36 bytes
     meta_sect_size = 36
     data_end = data_offset + meta_sect_size  # = 48
-    
-    # Pack header
-    struct.pack_into("<HH", buf, 0, section_count, data_end)
-    
-    # Pack section_entry[0]: type(le32) + offset(le16) + size(le16)
-    struct.pack_into("<IHH", buf, 4, ICE_SID_METADATA, data_offset, meta_sect_size)
-    
-    # Pack ice_meta_sect at data_offset
-    meta_ver = pack_pkg_ver(1, 3, 0, 0)
-    meta_name = PKG_NAME[:ICE_META_SECT_NAME_SIZE].ljust(ICE_META_SECT_NAME_SIZE, b'\x00')
-    meta_track_id = struct.pack("<I", 0)
-    
-    meta_sect = meta_ver + meta_name + meta_track_id
-    buf[data_offset:data_offset + len(meta_sect)] = meta_sect
-    
-    return bytes(buf)
+
+    # One compiled-Struct pack for the 48 populated bytes, then the shared
+    # zero pad instead of memsetting a fresh 4 KB bytearray.
+    head = _ICE_BUF_STRUCT.pack(section_count, data_end,
+                                ICE_SID_METADATA, data_offset, meta_sect_size,
+                                _VER_1_3_0_0, _PKG_NAME_28, 0)
+    return head + _ICE_BUF_PAD
 
 
 def build_ice_segment():
@@ -131,21 +149,14 @@ def build_ice_segment():
         struct ice_buf buf_array[];  // 1 * 4096 bytes
     };
     """
-    fmt_ver = pack_pkg_ver(1, 3, 0, 0)
-    
-    # Body parts
-    device_table_count = struct.pack("<I", 0)   # No device entries
-    nvm_table_count = struct.pack("<I", 0)       # No NVM entries
-    buf_count = struct.pack("<I", 1)             # 1 buffer
-    ice_buf = build_ice_buf()                     # 4096 bytes
-    
-    body = device_table_count + nvm_table_count + buf_count + ice_buf
-    
-    # seg_size = header(44) + body
-    seg_size = 44 + len(body)
-    hdr = pack_seg_hdr(SEGMENT_TYPE_ICE_E810, fmt_ver, seg_size, SEG_ID_ICE)
-    
-    return hdr + body
+    ice_buf = build_ice_buf()  # 4096 bytes
+
+    # seg_size = header(44) + counts(12) + buf(4096)
+    seg_size = _ICE_SEG_PREFIX.size + len(ice_buf)
+    # One pack for hdr + device_table_count(0) + nvm table_count(0) + buf_count(1)
+    prefix = _ICE_SEG_PREFIX.pack(SEGMENT_TYPE_ICE_E810, _VER_1_3_0_0, seg_size,
+                                  _SEG_ID_ICE_PADDED, 0, 0, 1)
+    return prefix + ice_buf
 
 
 def build_package():
@@ -159,60 +170,63 @@ def build_package():
     """
     metadata_seg = build_metadata_segment()
     ice_seg = build_ice_segment()
-    
-    # Package header: format_ver(4) + seg_count(4) + seg_offset[2](8) = 16 bytes
-    pkg_hdr_size = 4 + 4 + 4 * 2  # = 16
-    
-    metadata_offset = pkg_hdr_size
+
+    metadata_offset = _PKG_HDR.size  # = 16
     ice_offset = metadata_offset + len(metadata_seg)
-    
-    pkg_format_ver = pack_pkg_ver(1, 0, 0, 0)
-    pkg_hdr = pkg_format_ver + struct.pack("<I", 2)  # seg_count = 2
-    pkg_hdr += struct.pack("<I", metadata_offset)
-    pkg_hdr += struct.pack("<I", ice_offset)
-    
-    package = pkg_hdr + metadata_seg + ice_seg
-    
-    return package
+
+    # Fill one preallocated buffer instead of concatenating hdr + segments
+    package = bytearray(ice_offset + len(ice_seg))
+    _PKG_HDR.pack_into(package, 0, _VER_1_0_0_0, 2, metadata_offset, ice_offset)
+    package[metadata_offset:ice_offset] = metadata_seg
+    package[ice_offset:] = ice_seg
+
+    return bytes(package)
 
 
 def validate_package(data):
-    """Basic validation of the generated package."""
+    """Basic validation of the generated package.
+
+    Returns a dict of parsed fields for _report(), or None when validation
+    is compiled out (python -O), so production builds skip the ~15 unpacks.
+    """
+    if not __debug__:
+        return None
+
+    # Zero-copy reads: unpack_from on a memoryview avoids a bytes slice per field
+    mv = memoryview(data)
+
     # Check format version
-    fmt_ver = struct.unpack("BBBB", data[0:4])
+    fmt_ver = _PKGVER.unpack_from(mv, 0)
     assert fmt_ver == (1, 0, 0, 0), f"Bad format version: {fmt_ver}"
-    
+
     # Check segment count
-    seg_count = struct.unpack("<I", data[4:8])[0]
+    seg_count = _U32.unpack_from(mv, 4)[0]
     assert seg_count == 2, f"Bad segment count: {seg_count}"
-    
+
     # Check segment offsets
-    meta_off = struct.unpack("<I", data[8:12])[0]
-    ice_off = struct.unpack("<I", data[12:16])[0]
-    
+    meta_off = _U32.unpack_from(mv, 8)[0]
+    ice_off = _U32.unpack_from(mv, 12)[0]
+
     # Check metadata segment
-    meta_seg_type = struct.unpack("<I", data[meta_off:meta_off+4])[0]
+    meta_seg_type = _U32.unpack_from(mv, meta_off)[0]
     assert meta_seg_type == SEGMENT_TYPE_METADATA, f"Bad metadata seg type: {meta_seg_type:#x}"
-    
-    meta_seg_size = struct.unpack("<I", data[meta_off+8:meta_off+12])[0]
+
+    meta_seg_size = _U32.unpack_from(mv, meta_off + 8)[0]
     assert meta_off + meta_seg_size <= len(data), "Metadata segment exceeds package"
-    
+
     # Check ICE segment
-    ice_seg_type = struct.unpack("<I", data[ice_off:ice_off+4])[0]
+    ice_seg_type = _U32.unpack_from(mv, ice_off)[0]
     assert ice_seg_type == SEGMENT_TYPE_ICE_E810, f"Bad ICE seg type: {ice_seg_type:#x}"
-    
-    ice_seg_size = struct.unpack("<I", data[ice_off+8:ice_off+12])[0]
+
+    ice_seg_size = _U32.unpack_from(mv, ice_off + 8)[0]
     assert ice_off + ice_seg_size <= len(data), "ICE segment exceeds package"
-    
+
     # Check buffer header in ICE segment
     # After ice_seg header(44) + device_table_count(4) + nvm_table_count(4) + buf_count(4)
     buf_start = ice_off + 44 + 4 + 4 + 4  # Start of buf_array[0]
-    section_count = struct.unpack("<H", data[buf_start:buf_start+2])[0]
-    data_end = struct.unpack("<H", data[buf_start+2:buf_start+4])[0]
-    sect_type = struct.unpack("<I", data[buf_start+4:buf_start+8])[0]
-    sect_offset = struct.unpack("<H", data[buf_start+8:buf_start+10])[0]
-    sect_size = struct.unpack("<H", data[buf_start+10:buf_start+12])[0]
-    
+    section_count, data_end = _BUFHDR.unpack_from(mv, buf_start)
+    sect_type, sect_offset, sect_size = _SECTENT.unpack_from(mv, buf_start + 4)
+
     assert section_count == 1, f"Bad section count: {section_count}"
     assert 12 <= data_end <= ICE_PKG_BUF_SIZE, f"Bad data_end: {data_end}"
     assert sect_type == ICE_SID_METADATA, f"Bad section type: {sect_type:#x}"
@@ -222,36 +236,106 @@ def validate_package(data):
     
     # Check ice_meta_sect
     meta_addr = buf_start + sect_offset
-    meta_ver = struct.unpack("BBBB", data[meta_addr:meta_addr+4])
+    meta_ver = _PKGVER.unpack_from(mv, meta_addr)
     assert meta_ver == (1, 3, 0, 0), f"Bad metadata version: {meta_ver}"
     
     meta_name = data[meta_addr+4:meta_addr+4+ICE_META_SECT_NAME_SIZE]
     assert meta_name.startswith(PKG_NAME[:ICE_META_SECT_NAME_SIZE]), \
         f"Bad metadata name: {meta_name}"
-    
-    print(f"Package validated successfully:")
-    print(f"  Total size: {len(data)} bytes")
-    print(f"  Format version: {fmt_ver}")
-    print(f"  Segments: {seg_count}")
-    print(f"  Metadata seg at offset {meta_off}, size {meta_seg_size}")
-    print(f"  ICE seg at offset {ice_off}, size {ice_seg_size}")
-    print(f"  Buffer section: type={sect_type}, offset={sect_offset}, size={sect_size}")
-    print(f"  Metadata: ver={meta_ver}, name={meta_name.rstrip(b'\\x00').decode()}")
 
+    return {
+        "fmt_ver": fmt_ver,
+        "seg_count": seg_count,
+        "meta_off": meta_off,
+        "meta_seg_size": meta_seg_size,
+        "ice_off": ice_off,
+        "ice_seg_size": ice_seg_size,
+        "sect_type": sect_type,
+        "sect_offset": sect_offset,
+        "sect_size": sect_size,
+        "meta_ver": meta_ver,
+        "meta_name": meta_name,
+    }
 
-def main():
-    if len(sys.argv) < 2:
-        output_path = "ice.pkg"
-    else:
-        output_path = sys.argv[1]
-    
+
+def _report(data, info):
+    """Print the validation summary (CLI only; library callers skip this)."""
+    name_str = info["meta_name"].rstrip(b'\x00').decode()
+    # One stdout write for the whole report instead of a print per line
+    sys.stdout.write(
+        f"Package validated successfully:\n"
+        f"  Total size: {len(data)} bytes\n"
+        f"  Format version: {info['fmt_ver']}\n"
+        f"  Segments: {info['seg_count']}\n"
+        f"  Metadata seg at offset {info['meta_off']}, size {info['meta_seg_size']}\n"
+        f"  ICE seg at offset {info['ice_off']}, size {info['ice_seg_size']}\n"
+        f"  Buffer section: type={info['sect_type']}, offset={info['sect_offset']}, size={info['sect_size']}\n"
+        f"  Metadata: ver={info['meta_ver']}, name={name_str}\n")
+
+
+def regenerate_blob():
+    """Rebuild the package from the constants above and rewrite ice_pkg_blob.py.
+
+    Run this (via --rebuild) whenever the package constants change, then commit
+    the regenerated blob alongside the change.
+    """
     package = build_package()
-    validate_package(package)
-    
+    info = validate_package(package)
+    if info is not None:
+        _report(package, info)
+
+    blob_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ice_pkg_blob.py")
+    hexstr = package.hex()
+    with open(blob_path, "w") as f:
+        f.write('"""Precomputed ICE DDP package blob.\n'
+                '\n'
+                'Auto-generated by gen_ice_ddp.py --rebuild. Do not edit by hand.\n'
+                '"""\n'
+                '\n'
+                'PACKAGE_BYTES = bytes.fromhex(\n')
+        for i in range(0, len(hexstr), 64):
+            f.write(f'    "{hexstr[i:i+64]}"\n')
+        f.write(')\n')
+
+    print(f"\nWritten {len(package)}-byte blob to {blob_path}")
+    return package
+
+
+def check_blob():
+    """Verify the precomputed blob matches a fresh build (drift check for CI)."""
+    if PACKAGE_BYTES is None:
+        print("ice_pkg_blob.py is missing; run with --rebuild", file=sys.stderr)
+        sys.exit(1)
+    if build_package() != PACKAGE_BYTES:
+        print("ice_pkg_blob.py is stale; run with --rebuild", file=sys.stderr)
+        sys.exit(1)
+    print("Blob matches build_package() output")
+
+
+def main():
+    if "--rebuild" in sys.argv:
+        regenerate_blob()
+        return
+    if "--check" in sys.argv:
+        check_blob()
+        return
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    output_path = args[0] if args else "ice.pkg"
+
+    package = PACKAGE_BYTES if PACKAGE_BYTES is not None else build_package()
+    info = validate_package(package)
+    if info is not None:
+        _report(package, info)
+
     os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
-    with open(output_path, "wb") as f:
-        f.write(package)
-    
+    # Single fixed-size write: raw fd skips the BufferedWriter copy
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, package)
+    finally:
+        os.close(fd)
+
     print(f"\nWritten {len(package)} bytes to {output_path}")
 
 